@@ -10,6 +10,8 @@ class ShortDeckPokerPlayer(Player):
     player has folded or not.
     """
 
+    __slots__ = ("is_turn",)
+
     def __init__(self, player_i: int, initial_chips: int, pot: Pot):
         """Instanciate a player."""
         super().__init__(
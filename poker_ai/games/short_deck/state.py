@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import collections
 import copy
+import enum
 import json
 import logging
 import operator
@@ -21,6 +22,28 @@ logger = logging.getLogger("poker_ai.games.short_deck.state")
 InfoSetLookupTable = Dict[str, Dict[Tuple[int, ...], str]]
 
 
+class LegalActionFlag(enum.IntFlag):
+    """Bitmask of the actions that are legal for a state.
+
+    An empty mask means the current player has folded already, and so the
+    only legal action is to do nothing (None).
+    """
+
+    FOLD = 1
+    CALL = 2
+    RAISE = 4
+    # The combinations of actions a state can allow.
+    FOLD_OR_CALL = FOLD | CALL
+    FOLD_CALL_OR_RAISE = FOLD | CALL | RAISE
+
+
+_legal_actions_lut: Dict[int, List[Optional[str]]] = {
+    0: [None],
+    LegalActionFlag.FOLD_OR_CALL: ["fold", "call"],
+    LegalActionFlag.FOLD_CALL_OR_RAISE: ["fold", "call", "raise"],
+}
+
+
 def new_game(
     n_players: int, card_info_lut: InfoSetLookupTable = {}, **kwargs
 ) -> ShortDeckPokerState:
@@ -66,8 +89,10 @@ def new_game(
 class ShortDeckPokerState:
     """The state of a Short Deck Poker game at some given point in time.
 
-    The class is immutable and new state can be instanciated from once an
-    action is applied via the `ShortDeckPokerState.new_state` method.
+    By default the state is treated as immutable and a new state is
+    instanciated once an action is applied via the
+    `ShortDeckPokerState.apply_action` method. Passing `inplace=True` to that
+    method instead mutates and returns the state itself.
     """
 
     def __init__(
@@ -142,8 +167,34 @@ class ShortDeckPokerState:
         """Return a helpful description of object in strings and debugger."""
         return f"<ShortDeckPokerState player_i={self.player_i} betting_stage={self._betting_stage}>"
 
-    def apply_action(self, action_str: Optional[str]) -> ShortDeckPokerState:
-        """Create a new state after applying an action.
+    def fast_clone(self) -> ShortDeckPokerState:
+        """Return a copy of this state that is much cheaper than a deepcopy.
+
+        Only the objects that are mutated when an action is applied are
+        copied: the table with its players, pot, dealer, deck and community
+        cards, the poker engine and the action history. The rest is shared
+        between the states, namely the cards, the card information lookup
+        table, the betting stage lookup tables, the hand evaluator and the
+        engine's `PokerGameState`.
+
+        Returns
+        -------
+        new_state : ShortDeckPokerState
+            A copy of this state that actions can be applied to without
+            affecting this state.
+        """
+        new_state = copy.copy(self)
+        new_state._table = self._table.clone()
+        new_state._poker_engine = self._poker_engine.clone(table=new_state._table)
+        new_state._history = collections.defaultdict(
+            list, {stage: list(actions) for stage, actions in self._history.items()}
+        )
+        return new_state
+
+    def apply_action(
+        self, action_str: Optional[str], inplace: bool = False
+    ) -> ShortDeckPokerState:
+        """Create a new state after applying an action, or update this one.
 
         Parameters
         ----------
@@ -151,45 +202,50 @@ class ShortDeckPokerState:
             The description of the action the current player is making. Can be
             any of {"fold, "call", "raise"}, the latter two only being possible
             if the agent hasn't folded already.
+        inplace : bool
+            If true, apply the action to this state rather than to a copy of
+            it. Only use this when the previous state is no longer needed.
 
         Returns
         -------
         new_state : ShortDeckPokerState
             A poker state instance that represents the game in the next
-            timestep, after the action has been applied.
+            timestep, after the action has been applied. This is the same
+            instance if `inplace` is true.
         """
-        if action_str not in self.legal_actions:
+        legal_actions = self.legal_actions
+        if action_str not in legal_actions:
             raise ValueError(
-                f"Action '{action_str}' not in legal actions: " f"{self.legal_actions}"
+                f"Action '{action_str}' not in legal actions: " f"{legal_actions}"
             )
-        # Deep copy the parts of state that are needed that must be immutable
-        # from state to state.
-        lut = self.card_info_lut
-        self.card_info_lut = {}
-        new_state = copy.deepcopy(self)
-        new_state.card_info_lut = self.card_info_lut = lut
+        if inplace:
+            new_state = self
+        else:
+            # Copy the parts of state that are needed that must be immutable
+            # from state to state.
+            new_state = self.fast_clone()
         # An action has been made, so alas we are not in the first move of the
         # current betting round.
         new_state._first_move_of_current_round = False
+        # The current player only changes once the action has been applied.
+        current_player = new_state.current_player
         if action_str is None:
             # Assert active player has folded already.
-            assert (
-                not new_state.current_player.is_active
-            ), "Active player cannot do nothing!"
+            assert not current_player.is_active, "Active player cannot do nothing!"
         elif action_str == "call":
-            action = new_state.current_player.call(players=new_state.players)
+            action = current_player.call(players=new_state.players)
             logger.debug("calling")
         elif action_str == "fold":
-            action = new_state.current_player.fold()
+            action = current_player.fold()
         elif action_str == "raise":
             bet_n_chips = new_state.big_blind
             if new_state._betting_stage in {"turn", "river"}:
                 bet_n_chips *= 2
             biggest_bet = max(p.n_bet_chips for p in new_state.players)
-            n_chips_to_call = biggest_bet - new_state.current_player.n_bet_chips
+            n_chips_to_call = biggest_bet - current_player.n_bet_chips
             raise_n_chips = bet_n_chips + n_chips_to_call
             logger.debug(f"betting {raise_n_chips} n chips")
-            action = new_state.current_player.raise_to(n_chips=raise_n_chips)
+            action = current_player.raise_to(n_chips=raise_n_chips)
             new_state._n_raises += 1
         else:
             raise ValueError(
@@ -217,8 +273,7 @@ class ShortDeckPokerState:
                 new_state._first_move_of_current_round = True
             if not new_state.current_player.is_active:
                 new_state._skip_counter += 1
-                assert not new_state.current_player.is_active
-            elif new_state.current_player.is_active:
+            else:
                 if new_state._poker_engine.n_players_with_moves == 1:
                     # No players left.
                     new_state._betting_stage = "terminal"
@@ -444,17 +499,19 @@ class ShortDeckPokerState:
         """Returns a reference to player that makes a move for this state."""
         return self._table.players[self.player_i]
 
+    @property
+    def legal_actions_mask(self) -> LegalActionFlag:
+        """Return the actions that are legal for this game state as a mask."""
+        if not self.current_player.is_active:
+            return LegalActionFlag(0)
+        if self._n_raises < 3:
+            # In limit hold'em we can only bet/raise if there have been less
+            # than three raises in this round of betting, or if there are two
+            # players playing.
+            return LegalActionFlag.FOLD_CALL_OR_RAISE
+        return LegalActionFlag.FOLD_OR_CALL
+
     @property
     def legal_actions(self) -> List[Optional[str]]:
         """Return the actions that are legal for this game state."""
-        actions: List[Optional[str]] = []
-        if self.current_player.is_active:
-            actions += ["fold", "call"]
-            if self._n_raises < 3:
-                # In limit hold'em we can only bet/raise if there have been
-                # less than three raises in this round of betting, or if there
-                # are two players playing.
-                actions += ["raise"]
-        else:
-            actions += [None]
-        return actions
+        return list(_legal_actions_lut[self.legal_actions_mask])
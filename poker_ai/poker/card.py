@@ -30,6 +30,8 @@ def get_all_ranks() -> List[str]:
 class Card:
     """Card to represent a poker card."""
 
+    __slots__ = ("_rank", "_suit", "_eval_card")
+
     def __init__(self, rank: Union[str, int], suit: str):
         """Instanciate the card."""
         if not isinstance(rank, (int, str)):
@@ -81,6 +83,15 @@ class Card:
     def __hash__(self):
         return hash(int(self))
 
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        # Lookup tables pickled before `__slots__` were added store the
+        # attributes in a plain dict, so this handles both.
+        for name, value in state.items():
+            setattr(self, name, value)
+
     @property
     def eval_card(self) -> EvaluationCard:
         """Return an `EvaluationCard` for use in the `Evaluator`."""
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import copy
 from typing import List, TYPE_CHECKING
 
 from poker_ai.poker.deck import Deck
@@ -16,6 +17,12 @@ class Dealer:
     def __init__(self, **deck_kwargs):
         self.deck = Deck(**deck_kwargs)
 
+    def clone(self) -> Dealer:
+        """Return a copy of the dealer with its own deck."""
+        new_dealer = copy.copy(self)
+        new_dealer.deck = self.deck.clone()
+        return new_dealer
+
     def deal_card(self) -> Card:
         """Return a completely random card."""
         return self.deck.pick(random=True)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import copy
 import random
 from typing import List
 
@@ -38,6 +39,13 @@ class Deck:
         self._dealt_cards: List[Card] = []
         random.shuffle(self._cards_in_deck)
 
+    def clone(self) -> Deck:
+        """Return a copy of the deck that can be dealt from independently."""
+        new_deck = copy.copy(self)
+        new_deck._cards_in_deck = list(self._cards_in_deck)
+        new_deck._dealt_cards = list(self._dealt_cards)
+        return new_deck
+
     def pick(self, random: bool = True) -> Card:
         """Return a card from the deck.
 
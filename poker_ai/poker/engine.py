@@ -34,6 +34,17 @@ class PokerEngine:
         self.state = PokerGameState.new_hand(self.table)
         self.wins_and_losses = []
 
+    def clone(self, table: PokerTable) -> PokerEngine:
+        """Return a copy of the engine that runs the hand on `table`.
+
+        The hand evaluator only holds lookup tables, and the engine's
+        `PokerGameState` is immutable, so both are shared with this engine.
+        """
+        new_engine = copy.copy(self)
+        new_engine.table = table
+        new_engine.wins_and_losses = list(self.wins_and_losses)
+        return new_engine
+
     def play_one_round(self):
         """"""
         self.round_setup()
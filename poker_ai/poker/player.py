@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import copy
 import logging
 import uuid
 from abc import ABC, abstractmethod
@@ -28,6 +29,19 @@ class Player:
     of all players' contributions.
     """
 
+    __slots__ = (
+        "name",
+        "n_chips",
+        "cards",
+        "_is_active",
+        "id",
+        "pot",
+        "order",
+        "is_small_blind",
+        "is_big_blind",
+        "is_dealer",
+    )
+
     def __init__(self, name: str, initial_chips: int, pot: Pot):
         """Instanciate a player."""
         self.name: str = name
@@ -50,6 +64,16 @@ class Player:
                 self.n_bet_chips,
                 int(not self._is_active))
 
+    def clone(self) -> Player:
+        """Return a copy of the player with its own list of private cards.
+
+        The cards themselves and the pot are shared with this player, so the
+        pot should be replaced if the copy is to bet independently.
+        """
+        new_player = copy.copy(self)
+        new_player.cards = list(self.cards)
+        return new_player
+
     def add_chips(self, chips: int):
         """Add chips."""
         self.n_chips += chips
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import collections
+import copy
 import uuid
+from typing import Dict
 
 from poker_ai.poker.player import Player
 
@@ -9,6 +11,8 @@ from poker_ai.poker.player import Player
 class Pot:
     """"""
 
+    __slots__ = ("_pot", "_uid")
+
     def __init__(self):
         """"""
         self._pot = collections.Counter()
@@ -33,6 +37,18 @@ class Pot:
         """Reset the pot."""
         self._pot = collections.Counter()
 
+    def clone(self, player_lut: Dict[Player, Player]) -> Pot:
+        """Return a copy of the pot with the contributions of other players.
+
+        The returned pot keeps the same uid, and each contribution is moved
+        from the player to the player it maps to in `player_lut`.
+        """
+        new_pot = copy.copy(self)
+        new_pot._pot = collections.Counter(
+            {player_lut[player]: n_chips for player, n_chips in self._pot.items()}
+        )
+        return new_pot
+
     @property
     def side_pots(self):
         """Compute the side pots."""
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import copy
 from typing import List, TYPE_CHECKING
 
 from poker_ai.poker.dealer import Dealer
@@ -41,6 +42,23 @@ class PokerTable:
         if not all(p.pot.uid == self.pot.uid for p in self.players):
             raise ValueError(f'Players and table point to different pots.')
 
+    def clone(self) -> PokerTable:
+        """Return a copy of the table with its own players, pot and dealer.
+
+        The pot is keyed by the players, so it is rebuilt with the copied
+        players, which in turn all point at the copied pot.
+        """
+        players = [player.clone() for player in self.players]
+        pot = self.pot.clone(player_lut=dict(zip(self.players, players)))
+        for player in players:
+            player.pot = pot
+        new_table = copy.copy(self)
+        new_table.players = players
+        new_table.pot = pot
+        new_table.dealer = self.dealer.clone()
+        new_table.community_cards = list(self.community_cards)
+        return new_table
+
     def add_community_card(self, card: Card):
         """Add a public card to the table for all players to use."""
         self.community_cards.append(card)
@@ -1,18 +1,58 @@
 import collections
-import copy
+import functools
+import itertools
 import random
-from typing import List, Tuple, Optional
+from typing import Counter, List, NamedTuple, Tuple, Optional
 
 import pytest
 import numpy as np
 import dill as pickle
 
-from poker_ai.games.short_deck.state import ShortDeckPokerState
+from poker_ai.games.short_deck.state import LegalActionFlag, ShortDeckPokerState
 from poker_ai.games.short_deck.player import ShortDeckPokerPlayer
-from poker_ai.poker.card import Card
 from poker_ai.poker.pot import Pot
 from poker_ai.utils.random import seed
 
+# Number of random games played by `test_call_action_sequence`, split over
+# this many independently seeded chunks.
+N_GAMES = 200
+N_CHUNKS = 8
+
+
+@functools.lru_cache(maxsize=None)
+def _new_game_template(
+    n_players: int, small_blind: int, big_blind: int, initial_chips: int,
+) -> Tuple[ShortDeckPokerState, Pot]:
+    """Create the initial state of a game and its pot, once per configuration.
+
+    The returned state is shared, so it must never have actions applied to it
+    or be otherwise mutated. The template is always shuffled and dealt under
+    the same seed, so it doesn't depend on which test happens to build it
+    first. The callers random state is restored afterwards, so seeding before
+    a call still controls everything that happens after it.
+    """
+    random_state = random.getstate()
+    np_random_state = np.random.get_state()
+    seed(42)
+    try:
+        pot = Pot()
+        players = [
+            ShortDeckPokerPlayer(
+                player_i=player_i, pot=pot, initial_chips=initial_chips
+            )
+            for player_i in range(n_players)
+        ]
+        state = ShortDeckPokerState(
+            players=players,
+            load_card_lut=False,
+            small_blind=small_blind,
+            big_blind=big_blind,
+        )
+    finally:
+        random.setstate(random_state)
+        np.random.set_state(np_random_state)
+    return state, pot
+
 
 def _new_game(
     n_players: int,
@@ -20,19 +60,22 @@ def _new_game(
     big_blind: int = 100,
     initial_chips: int = 10000,
 ) -> Tuple[ShortDeckPokerState, Pot]:
-    """Create a new game."""
-    pot = Pot()
-    players = [
-        ShortDeckPokerPlayer(player_i=player_i, pot=pot, initial_chips=initial_chips)
-        for player_i in range(n_players)
-    ]
-    state = ShortDeckPokerState(
-        players=players,
-        load_card_lut=False,
-        small_blind=small_blind,
-        big_blind=big_blind,
-    )
-    return state, pot
+    """Create a new game, cloned from the template for its configuration."""
+    template, _ = _new_game_template(n_players, small_blind, big_blind, initial_chips)
+    state = template.fast_clone()
+    # The clone has its own pot that its players reference.
+    return state, state.players[0].pot
+
+
+@pytest.fixture(scope="module", params=[2, 3])
+def fresh_state_factory(request):
+    """Return a callable that clones the cached initial state of a new game.
+
+    Every clone starts from the same deal, only the cards dealt after the
+    private cards and the actions taken vary between games.
+    """
+    template, _ = _new_game_template(request.param, 50, 100, 10000)
+    return template.fast_clone
 
 
 def _load_action_sequences(directory):
@@ -41,24 +84,53 @@ def _load_action_sequences(directory):
     return action_sequences
 
 
+class _Round(NamedTuple):
+    """The action every player takes in a round and what they should see."""
+
+    action: str
+    stage: str
+    player_i_order: List[int]
+    mask: LegalActionFlag
+
+
+def _play_rounds(
+    state: ShortDeckPokerState, rounds: List[_Round]
+) -> ShortDeckPokerState:
+    """Apply the actions of each round and compare the trace once at the end."""
+    player_is, masks, stages = [], [], []
+    for round_ in rounds:
+        for _ in round_.player_i_order:
+            player_is.append(state.player_i)
+            masks.append(state.legal_actions_mask)
+            stages.append(state.betting_stage)
+            state = state.apply_action(action_str=round_.action, inplace=True)
+    assert player_is == [p_i for r in rounds for p_i in r.player_i_order]
+    assert masks == [r.mask for r in rounds for _ in r.player_i_order]
+    assert stages == [r.stage for r in rounds for _ in r.player_i_order]
+    return state
+
+
 def test_short_deck_1():
     """Test the short deck poker game state works as expected."""
-    n_players = 3
-    state, _ = _new_game(n_players=n_players)
-    # Call for all players.
-    player_i_order = [2, 0, 1]
-    for i in range(n_players):
-        assert state.current_player.name == f"player_{player_i_order[i]}"
-        assert len(state.legal_actions) == 3
-        assert state.betting_stage == "pre_flop"
-        state = state.apply_action(action_str="call")
-    assert state.betting_stage == "flop"
-    # Fold for all but last player.
-    for player_i in range(n_players - 1):
-        assert state.current_player.name == f"player_{player_i}"
-        assert len(state.legal_actions) == 3
-        assert state.betting_stage == "flop"
-        state = state.apply_action(action_str="fold")
+    state, _ = _new_game(n_players=3)
+    assert state.current_player.name == "player_2"
+    rounds = [
+        # Call for all players.
+        _Round(
+            action="call",
+            stage="pre_flop",
+            player_i_order=[2, 0, 1],
+            mask=LegalActionFlag.FOLD_CALL_OR_RAISE,
+        ),
+        # Fold for all but last player.
+        _Round(
+            action="fold",
+            stage="flop",
+            player_i_order=[0, 1],
+            mask=LegalActionFlag.FOLD_CALL_OR_RAISE,
+        ),
+    ]
+    state = _play_rounds(state, rounds)
     # Only one player left, so game state should be terminal.
     assert state.is_terminal, "state was not terminal"
     assert state.betting_stage == "terminal"
@@ -66,45 +138,53 @@ def test_short_deck_1():
 
 def test_short_deck_2():
     """Test the short deck poker game state works as expected."""
-    n_players = 3
     state, _ = _new_game(n_players=3)
-    player_i_order = [2, 0, 1]
-    # Call for all players.
-    for i in range(n_players):
-        assert state.current_player.name == f"player_{player_i_order[i]}"
-        assert len(state.legal_actions) == 3
-        assert state.betting_stage == "pre_flop"
-        state = state.apply_action(action_str="call")
-    # Raise for all players.
-    for player_i in range(n_players):
-        assert state.current_player.name == f"player_{player_i}"
-        assert len(state.legal_actions) == 3
-        assert state.betting_stage == "flop"
-        state = state.apply_action(action_str="raise")
-    # Call for all players and ensure all players have chipped in the same..
-    for player_i in range(n_players - 1):
-        assert state.current_player.name == f"player_{player_i}"
-        assert len(state.legal_actions) == 2
-        assert state.betting_stage == "flop"
-        state = state.apply_action(action_str="call")
-    # Raise for all players.
-    for player_i in range(n_players):
-        assert state.current_player.name == f"player_{player_i}"
-        assert len(state.legal_actions) == 3
-        assert state.betting_stage == "turn"
-        state = state.apply_action(action_str="raise")
-    # Call for all players and ensure all players have chipped in the same..
-    for player_i in range(n_players - 1):
-        assert state.current_player.name == f"player_{player_i}"
-        assert len(state.legal_actions) == 2
-        assert state.betting_stage == "turn"
-        state = state.apply_action(action_str="call")
-    # Fold for all but last player.
-    for player_i in range(n_players - 1):
-        assert state.current_player.name == f"player_{player_i}"
-        assert len(state.legal_actions) == 3
-        assert state.betting_stage == "river"
-        state = state.apply_action(action_str="fold")
+    assert state.current_player.name == "player_2"
+    rounds = [
+        # Call for all players.
+        _Round(
+            action="call",
+            stage="pre_flop",
+            player_i_order=[2, 0, 1],
+            mask=LegalActionFlag.FOLD_CALL_OR_RAISE,
+        ),
+        # Raise for all players.
+        _Round(
+            action="raise",
+            stage="flop",
+            player_i_order=[0, 1, 2],
+            mask=LegalActionFlag.FOLD_CALL_OR_RAISE,
+        ),
+        # Call for all players and ensure all players have chipped in the same.
+        _Round(
+            action="call",
+            stage="flop",
+            player_i_order=[0, 1],
+            mask=LegalActionFlag.FOLD_OR_CALL,
+        ),
+        # Raise for all players.
+        _Round(
+            action="raise",
+            stage="turn",
+            player_i_order=[0, 1, 2],
+            mask=LegalActionFlag.FOLD_CALL_OR_RAISE,
+        ),
+        # Call for all players and ensure all players have chipped in the same.
+        _Round(
+            action="call",
+            stage="turn",
+            player_i_order=[0, 1],
+            mask=LegalActionFlag.FOLD_OR_CALL,
+        ),
+        # Fold for all but last player.
+        _Round(
+            action="fold",
+            stage="river",
+            player_i_order=[0, 1],
+            mask=LegalActionFlag.FOLD_CALL_OR_RAISE,
+        ),
+    ]
+    state = _play_rounds(state, rounds)
     # Only one player left, so game state should be terminal.
     assert state.is_terminal, "state was not terminal"
     assert state.betting_stage == "terminal"
@@ -135,105 +215,150 @@ def test_short_deck_3(n_players: int):
         "turn": order,
         "river": order,
     }
-    prev_stage = ""
-    while state.betting_stage in player_i_order:
-        if state.betting_stage != prev_stage:
-            # If there is a new betting stage, reset the target player index
-            # counter.
-            order_i = 0
-            prev_stage = state.betting_stage
-        target_player_i = player_i_order[state.betting_stage][order_i]
+    # Each betting stage is only visited once, so every stage gets its own
+    # iterator of target players that is consumed as the players act.
+    targets = {
+        stage: iter([(player_i, f"player_{player_i}") for player_i in stage_order])
+        for stage, stage_order in player_i_order.items()
+    }
+    while state.betting_stage in targets:
+        target = next(targets[state.betting_stage], None)
         assert (
-            state.current_player.name == f"player_{target_player_i}"
-        ), f"{state.current_player.name} != player_{target_player_i}"
+            target is not None
+        ), f"more actions than players expected in {state.betting_stage}"
+        target_player_i, target_name = target
+        name = state.current_player.name
+        assert name == target_name, f"{name} != {target_name}"
         assert (
             state.player_i == target_player_i
         ), f"{state.player_i} != {target_player_i}"
         # All players call to keep things simple.
-        state = state.apply_action("call")
-        order_i += 1
-
-
-@pytest.mark.parametrize("n_players", [2, 3, 4, 5, 6])
-@pytest.mark.parametrize("small_blind", [50, 200])
-@pytest.mark.parametrize("big_blind", [100, 1000])
-def test_pre_flop_pot(n_players: int, small_blind: int, big_blind: int):
-    """Test preflop the state is set up for player 2 to start betting."""
-    state, pot = _new_game(
-        n_players=n_players, small_blind=small_blind, big_blind=big_blind,
-    )
-    n_bet_chips = sum(p.n_bet_chips for p in state.players)
-    target = small_blind + big_blind
-    assert state.player_i == 0 if n_players == 2 else 2
-    assert state.betting_stage == "pre_flop"
-    assert (
-        n_bet_chips == target
-    ), f"small and big blind have not bet! {n_bet_chips} == {target}"
-    assert (
-        n_bet_chips == pot.total
-    ), f"small and big blind have are not in pot! {n_bet_chips} == {pot.total}"
+        state = state.apply_action("call", inplace=True)
+
+
+def test_pre_flop_pot_batch():
+    """Test preflop the state is set up for player 2 to start betting.
+
+    All configurations are checked in one test and compared at once, the
+    failing configurations are reported in the assertion message.
+    """
+    configs = list(itertools.product([2, 3, 4, 5, 6], [50, 200], [100, 1000]))
+    player_i = np.zeros(len(configs), dtype=np.int32)
+    target_player_i = np.zeros(len(configs), dtype=np.int32)
+    n_bet_chips = np.zeros(len(configs), dtype=np.int32)
+    targets = np.zeros(len(configs), dtype=np.int32)
+    blind_bets = np.zeros((len(configs), 2), dtype=np.int32)
+    blinds = np.zeros((len(configs), 2), dtype=np.int32)
+    for config_i, (n_players, small_blind, big_blind) in enumerate(configs):
+        # Nothing is mutated here, so the shared template can be read directly.
+        state, pot = _new_game_template(n_players, small_blind, big_blind, 10000)
+        assert state.betting_stage == "pre_flop"
+        player_i[config_i] = state.player_i
+        target_player_i[config_i] = 0 if n_players == 2 else 2
+        # The players bets are read from the pot, so the pot total is the sum
+        # of them.
+        n_bet_chips[config_i] = pot.total
+        targets[config_i] = small_blind + big_blind
+        blind_bets[config_i] = [pot[state.players[0]], pot[state.players[1]]]
+        blinds[config_i] = [small_blind, big_blind]
+
+    def _failed(actual: np.ndarray, target: np.ndarray) -> List[Tuple[int, ...]]:
+        """Return the configurations where actual and target differ."""
+        mismatch = actual != target
+        if mismatch.ndim > 1:
+            mismatch = mismatch.any(axis=1)
+        return [configs[config_i] for config_i in np.where(mismatch)[0]]
+
+    assert np.array_equal(
+        player_i, target_player_i
+    ), f"wrong first player for {_failed(player_i, target_player_i)}"
+    assert np.array_equal(
+        n_bet_chips, targets
+    ), f"small and big blind have not bet! {_failed(n_bet_chips, targets)}"
+    assert np.array_equal(
+        blind_bets, blinds
+    ), f"small and big blind have are not in pot! {_failed(blind_bets, blinds)}"
 
 
 def test_flops_are_random():
     """Ensure across multiple runs that the flop varies."""
 
-    def _get_flop(state: ShortDeckPokerState) -> List[Card]:
-        """Get the public cards for the flop stage."""
-        save_state = copy.deepcopy(state)
-        while save_state.betting_stage != "flop":
-            # accounting for when we hit a terminal node before the flop
-            if save_state.betting_stage == "terminal":
-                return _get_flop(state)
-            action: Optional[str] = random.choice(save_state.legal_actions)
-            save_state = save_state.apply_action(action)
-        return save_state._table.community_cards
+    def _get_flop(state: ShortDeckPokerState) -> Tuple[int, int, int]:
+        """Get the public cards for the flop stage as eval_cards (ints)."""
+        while True:
+            save_state = state.fast_clone()
+            while save_state.betting_stage not in {"flop", "terminal"}:
+                # Calling never ends the game before the flop, so prefer it
+                # when it is available.
+                if save_state.legal_actions_mask & LegalActionFlag.CALL:
+                    action: Optional[str] = "call"
+                else:
+                    action = random.choice(save_state.legal_actions)
+                save_state = save_state.apply_action(action, inplace=True)
+            # Accounting for when we hit a terminal node before the flop.
+            if save_state.betting_stage == "flop":
+                return tuple(
+                    card.eval_card for card in save_state._table.community_cards
+                )
 
     seed(42)
     state, _ = _new_game(n_players=3, small_blind=50, big_blind=100)
     n_iterations = 5
-    # We'll store the public cards from the flop as eval_cards (ints).
-    flops: List[Tuple[int, int, int]] = []
+    # We'll count the public cards from the flop as eval_cards (ints).
+    flop_occurances: Counter[Tuple[int, int, int]] = collections.Counter()
     for _ in range(n_iterations):
-        flop = _get_flop(state)
-        flops.append(tuple([card.eval_card for card in flop]))
-    flop_occurances = collections.Counter(flops)
+        flop_occurances[_get_flop(state)] += 1
     # Ensure that we have not had the same flop `n_iterations` number of times
     # repeatedly.
     assert len(flop_occurances) > 1 and len(flop_occurances.most_common()) != 1
 
 
-@pytest.mark.parametrize("n_players", [2, 3])
-def test_call_action_sequence(n_players):
+@pytest.mark.parametrize("chunk_i", range(N_CHUNKS))
+def test_call_action_sequence(fresh_state_factory, chunk_i: int):
     """
     Make sure we never see an action sequence of "raise", "call", "call" in the same
     round with only two players. There would be a similar analog for more than two players,
     but this should aid in initially finding the bug.
+
+    The N_GAMES random games are split into independently seeded chunks so they can be
+    spread over several processes with pytest-xdist (``pytest -n auto``).
     """
     # Seed the random number generation so things are procedural/reproducable.
-    seed(42)
+    seed(42 + chunk_i)
+    # Draw the random choices of action in bulk. Each choice is taken modulo
+    # the number of legal actions, which is 1, 2 or 3, so the choices are
+    # drawn from [0, 6) to keep them uniform.
+    rng = np.random.default_rng(42 + chunk_i)
+    # Share the games between the chunks so they always add up to N_GAMES.
+    n_games = len(range(chunk_i, N_GAMES, N_CHUNKS))
+    # Enough for most games, the buffer is refilled if it runs out.
+    n_decisions = n_games * 64
+    decisions = rng.integers(0, 6, size=n_decisions, dtype=np.uint8)
+    decision_i = 0
     # example of a bad sequence in a two-handed game in one round
-    bad_seq = ["raise", "call", "call"]
+    bad_seq = ("raise", "call", "call")
     # Run some number of random iterations.
-    for _ in range(200):
-        state, _ = _new_game(n_players=n_players, small_blind=50, big_blind=100)
-        betting_round_dict = collections.defaultdict(list)
+    for _ in range(n_games):
+        state = fresh_state_factory()
+        # Only the most recent actions of each round can form the bad
+        # sequence, as the earlier ones were checked on previous steps.
+        betting_round_dict = collections.defaultdict(
+            lambda: collections.deque(maxlen=len(bad_seq))
+        )
         while state.betting_stage not in {"show_down", "terminal"}:
-            uniform_probability: float = 1 / len(state.legal_actions)
-            probabilities = np.full(len(state.legal_actions), uniform_probability)
-            random_action: str = np.random.choice(state.legal_actions, p=probabilities)
+            if decision_i == n_decisions:
+                decisions = rng.integers(0, 6, size=n_decisions, dtype=np.uint8)
+                decision_i = 0
+            legal_actions = state.legal_actions
+            random_action: str = legal_actions[
+                decisions[decision_i] % len(legal_actions)
+            ]
+            decision_i += 1
             if state._poker_engine.n_active_players == 2:
-                betting_round_dict[state.betting_stage].append(random_action)
-                no_fold_action_history: List[str] = [
-                    action
-                    for action in betting_round_dict[state.betting_stage]
-                    if action != "skip"
-                ]
-                # Loop through the action history and make sure the bad
-                # sequence has not happened.
-                for i in range(len(no_fold_action_history)):
-                    history_slice = no_fold_action_history[i : i + len(bad_seq)]
-                    assert history_slice != bad_seq
-            state = state.apply_action(random_action)
+                recent_actions = betting_round_dict[state.betting_stage]
+                recent_actions.append(random_action)
+                assert tuple(recent_actions) != bad_seq
+            state = state.apply_action(random_action, inplace=True)
 
 
 @pytest.mark.parametrize("n_players", [2, 3])
@@ -263,14 +388,15 @@ def test_action_sequence(n_players: int):
                     "n_players"
                 ] = state.n_players_started_round
                 betting_stage = state.betting_stage
-            uniform_probability: float = 1 / len(state.legal_actions)
-            probabilities = np.full(len(state.legal_actions), uniform_probability)
-            random_action: str = np.random.choice(state.legal_actions, p=probabilities)
+            legal_actions = state.legal_actions
+            uniform_probability: float = 1 / len(legal_actions)
+            probabilities = np.full(len(legal_actions), uniform_probability)
+            random_action: str = np.random.choice(legal_actions, p=probabilities)
 
             betting_stage_dict[state.betting_stage]["action_sequence"].append(
                 random_action
             )
-            state = state.apply_action(random_action)
+            state = state.apply_action(random_action, inplace=True)
 
         for betting_stage in betting_stage_dict.keys():
             if betting_stage_dict[betting_stage]["action_sequence"]:
@@ -292,10 +418,11 @@ def test_skips(n_players: int = 3):
         state, _ = _new_game(n_players=n_players, small_blind=50, big_blind=100)
 
         while True:
-            uniform_probability: float = 1 / len(state.legal_actions)
-            probabilities = np.full(len(state.legal_actions), uniform_probability)
-            random_action: str = np.random.choice(state.legal_actions, p=probabilities)
-            state = state.apply_action(random_action)
+            legal_actions = state.legal_actions
+            uniform_probability: float = 1 / len(legal_actions)
+            probabilities = np.full(len(legal_actions), uniform_probability)
+            random_action: str = np.random.choice(legal_actions, p=probabilities)
+            state = state.apply_action(random_action, inplace=True)
 
             if state.betting_stage in {"show_down", "terminal"}:
                 break
@@ -338,3 +465,41 @@ def test_skips(n_players: int = 3):
                         for i, action in enumerate(actions[fold_idx:]):
                             if i % n_players == 0:
                                 assert action == "skip"
+
+
+def test_fast_clone():
+    """Ensure a cloned state can be played on without changing the original."""
+    seed(42)
+    state, pot = _new_game(n_players=3)
+    clone = state.fast_clone()
+    assert clone.players[0].pot is clone._table.pot
+    assert clone._table.pot is not pot
+    assert clone._poker_engine.table is clone._table
+    for action_str in ["call", "call", "call", "raise"]:
+        clone = clone.apply_action(action_str)
+    assert clone.betting_stage == "flop"
+    assert len(clone.community_cards) == 3
+    assert state.betting_stage == "pre_flop"
+    assert not state.community_cards
+    assert pot.total == 150
+    assert sum(p.n_bet_chips for p in state.players) == 150
+    assert len(state._history["pre_flop"]) == 0
+
+
+def test_apply_action_inplace():
+    """Ensure applying an action in place only changes the state it is on."""
+    seed(42)
+    state, _ = _new_game(n_players=3)
+    new_state = state.apply_action("call")
+    assert new_state is not state
+    assert state.player_i == 2
+    assert new_state.player_i == 0
+    same_state = state.apply_action("call", inplace=True)
+    assert same_state is state
+    assert state.player_i == 0
+    assert state._history == new_state._history
+    # Playing on in place must not leak into the earlier copy.
+    state.apply_action("call", inplace=True)
+    assert state.player_i == 1
+    assert new_state.player_i == 0
+    assert len(new_state._history["pre_flop"]) == 1
@@ -1,3 +1,4 @@
+import pickle
 import random
 
 from poker_ai.poker.card import Card, get_all_suits
@@ -26,3 +27,18 @@ def test_card_equality():
         else:
             assert card_a != card_b
             assert int(card_a) != int(card_b)
+
+
+def test_card_pickle():
+    """Ensure cards survive pickling, including pickles from before slots."""
+    card, _ = random_card()
+    unpickled_card = pickle.loads(pickle.dumps(card))
+    assert unpickled_card == card
+    assert unpickled_card.suit == card.suit
+    # Cards pickled before `__slots__` were added stored a dict of attributes.
+    legacy_card = Card.__new__(Card)
+    legacy_card.__setstate__(
+        {"_rank": card.rank_int, "_suit": card.suit, "_eval_card": card.eval_card}
+    )
+    assert legacy_card == card
+    assert legacy_card.rank == card.rank
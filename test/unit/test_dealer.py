@@ -13,3 +13,15 @@ def test_dealer_1():
         deck_size = len(dealer.deck._cards_in_deck)
         assert deck_size == len(include_ranks * 4) - i
         assert len(dealer.deck._dealt_cards) == i
+
+
+def test_dealer_clone():
+    include_ranks = [10, 11, 12, 13, 14]
+    dealer = Dealer(include_ranks=include_ranks)
+    dealer.deal_card()
+    new_dealer = dealer.clone()
+    assert new_dealer.deck is not dealer.deck
+    new_dealer.deal_card()
+    assert len(dealer.deck._cards_in_deck) == len(include_ranks * 4) - 1
+    assert len(new_dealer.deck._cards_in_deck) == len(include_ranks * 4) - 2
+    assert len(dealer.deck._dealt_cards) == 1
@@ -0,0 +1,32 @@
+import ast
+import glob
+import os
+
+import pytest
+
+
+functional_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "functional")
+
+
+def _deepcopy_line_numbers(file_path: str):
+    """Return the lines of a module that import or call `copy.deepcopy`."""
+    with open(file_path, "r") as stream:
+        tree = ast.parse(stream.read(), filename=file_path)
+    line_numbers = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.module == "copy":
+            if any(alias.name == "deepcopy" for alias in node.names):
+                line_numbers.append(node.lineno)
+        elif isinstance(node, ast.Attribute) and node.attr == "deepcopy":
+            if isinstance(node.value, ast.Name) and node.value.id == "copy":
+                line_numbers.append(node.lineno)
+    return line_numbers
+
+
+@pytest.mark.parametrize(
+    "file_path", sorted(glob.glob(os.path.join(functional_dir, "*.py")))
+)
+def test_no_deepcopy_in_functional_tests(file_path: str):
+    """Ensure `copy.deepcopy` doesn't creep back in, use `fast_clone` instead."""
+    line_numbers = _deepcopy_line_numbers(file_path)
+    assert not line_numbers, f"copy.deepcopy used in {file_path} on {line_numbers}"